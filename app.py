@@ -10,15 +10,22 @@
 # - Placeholders for Supabase / Stripe integration (commented and documented)
 
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import aiohttp
+from selectolax.lexbor import LexborHTMLParser
 import pandas as pd
-import time
+import numpy as np
 from urllib.parse import quote_plus, urljoin
-from datetime import datetime, timedelta
 import os
 from PIL import Image, ImageStat
 import io
+import csv
+import time
+import queue
+import threading
+import atexit
+import random
+import re
 
 # ---------------- CONFIG ----------------
 APP_TITLE = "Vinted Market Scout — Private Edition"
@@ -29,6 +36,9 @@ DATA_LOG = "search_log.csv"
 SUBSCRIBERS_FILE = "subscribers.csv"
 REQUESTS_LOG_FILE = "access_requests.csv"
 DATA_FAVS = "favorites.csv"
+# Log rows are buffered and flushed in batches of up to LOG_FLUSH_BATCH rows / LOG_FLUSH_INTERVAL seconds
+LOG_FLUSH_BATCH = 100
+LOG_FLUSH_INTERVAL = 2.0
 
 # Default PayPal link placeholder (if you want to use manual payments later)
 PAYPAL_LINK = "https://www.paypal.com/paypalme/VOTRECOMPTE/25.99"
@@ -40,6 +50,9 @@ BRAND_OPTIONS = [
 ]
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+# Scraping politeness: max in-flight requests + statuses worth retrying (with backoff)
+MAX_CONCURRENT_REQUESTS = 10
+RETRY_STATUSES = (429, 500, 502, 503, 504)
 
 # Quick mode: start private (only admin full access). Set to False to open to all users.
 PRIVATE_BY_DEFAULT = True
@@ -63,137 +76,297 @@ st.markdown("<div class='muted'>Private-first: testez en local, puis monétisez
 st.write("")
 
 # ---------------- Utilities: logging, subscribers, favorites ----------------
-def _ensure_df(path, cols):
-    if os.path.exists(path):
-        try:
-            return pd.read_csv(path)
-        except:
-            return pd.DataFrame(columns=cols)
-    else:
+def _epoch_seconds(col):
+    # timestamps are int epoch seconds; rows written before that (ISO strings) are converted too
+    ts = pd.to_numeric(col, errors="coerce")
+    legacy = ts.isna() & col.notna()
+    if legacy.any():
+        parsed = pd.to_datetime(col[legacy], errors="coerce", format="mixed")
+        ts[legacy] = (parsed - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    return ts.astype("Int64")
+
+def _read_log(path, cols, dtypes=None, epoch_cols=()):
+    # typed read for the admin tables: known columns only, explicit dtypes (no inference pass).
+    # epoch_cols are read untyped so files that still hold ISO strings keep loading
+    if not os.path.exists(path):
         return pd.DataFrame(columns=cols)
+    try:
+        df = pd.read_csv(path, usecols=cols, dtype=dtypes)
+    except Exception:
+        return pd.DataFrame(columns=cols)
+    for c in epoch_cols:
+        df[c] = _epoch_seconds(df[c])
+    return df
+
+def _with_datetimes(df, cols):
+    # timestamps are stored as int epoch seconds; convert only for display
+    return df.assign(**{c: pd.to_datetime(df[c], unit="s") for c in cols})
+
+def _append_rows(path, cols, rows):
+    # append lines, header only for a new/empty file (no read + rewrite of the whole CSV)
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=cols)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+# Buffered log writes: rows are queued on the request path and written in batches
+# by one background thread, so disk I/O never blocks a Streamlit rerun.
+def _write_batch(batch):
+    # group by file so each CSV is opened once per flush
+    grouped = {}
+    for path, cols, rec in batch:
+        grouped.setdefault((path, tuple(cols)), []).append(rec)
+    for (path, cols), rows in grouped.items():
+        _append_rows(path, list(cols), rows)
+
+def _drain(q):
+    batch = []
+    while True:
+        try:
+            batch.append(q.get_nowait())
+        except queue.Empty:
+            return batch
+
+def _collect_batch(q):
+    # wait for a first row, then gather up to LOG_FLUSH_BATCH rows or LOG_FLUSH_INTERVAL seconds
+    try:
+        batch = [q.get(timeout=LOG_FLUSH_INTERVAL)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+    while len(batch) < LOG_FLUSH_BATCH:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(q.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def _flusher(q, stop):
+    while not stop.is_set():
+        batch = _collect_batch(q)
+        if batch:
+            try:
+                _write_batch(batch)
+            except Exception:
+                pass  # keep the flusher alive whatever happens; this batch is lost
+
+def _flush_now(q, stop, thread):
+    # on shutdown: stop the flusher (it finishes its batch) then write whatever is left
+    stop.set()
+    thread.join(timeout=LOG_FLUSH_INTERVAL*2)
+    _write_batch(_drain(q))
+
+@st.cache_resource
+def _log_queue():
+    # cache_resource: one queue + flusher per server process, not one per rerun
+    q = queue.Queue()
+    stop = threading.Event()
+    thread = threading.Thread(target=_flusher, args=(q, stop), daemon=True, name="log-flusher")
+    thread.start()
+    atexit.register(_flush_now, q, stop, thread)
+    return q
+
+_LOG_Q = _log_queue()
 
 def log_search(query, brand, user="admin"):
-    rec = {"timestamp": datetime.utcnow().isoformat(), "query": query, "brand": brand, "user": user}
-    df = _ensure_df(DATA_LOG, ["timestamp","query","brand","user"])
-    df = pd.concat([df, pd.DataFrame([rec])], ignore_index=True)
-    df.to_csv(DATA_LOG, index=False)
+    rec = {"timestamp": int(time.time()), "query": query, "brand": brand, "user": user}
+    _LOG_Q.put((DATA_LOG, ["timestamp","query","brand","user"], rec))
 
 def add_favorite(item: dict, user="admin"):
-    df = _ensure_df(DATA_FAVS, ["timestamp","title","price","link","user"])
-    rec = {"timestamp": datetime.utcnow().isoformat(), "title": item.get("title"), "price": item.get("price"), "link": item.get("link"), "user": user}
-    df = pd.concat([df, pd.DataFrame([rec])], ignore_index=True)
-    df.to_csv(DATA_FAVS, index=False)
+    rec = {"timestamp": int(time.time()), "title": item.get("title"), "price": item.get("price"), "link": item.get("link"), "user": user}
+    _LOG_Q.put((DATA_FAVS, ["timestamp","title","price","link","user"], rec))
 
 def load_subscribers():
-    df = _ensure_df(SUBSCRIBERS_FILE, ["email","start_date","expiry_date"])
-    # parse dates if present
-    try:
-        if not df.empty:
-            df['start_date'] = pd.to_datetime(df['start_date'])
-            df['expiry_date'] = pd.to_datetime(df['expiry_date'])
-    except:
-        pass
-    return df
-
-def save_subscribers(df):
-    df.to_csv(SUBSCRIBERS_FILE, index=False)
+    df = _read_log(SUBSCRIBERS_FILE, ["email","start_date","expiry_date"],
+                   dtypes={"email": "string"}, epoch_cols=["start_date","expiry_date"])
+    # subscribers.csv is append-only: a renewal is a new row, the last one per email wins
+    return df.drop_duplicates(subset="email", keep="last").reset_index(drop=True)
 
 def add_subscriber(email, days_valid=30):
-    df = load_subscribers()
-    now = datetime.utcnow()
-    expiry = now + timedelta(days=days_valid)
-    if email in df['email'].values:
-        df.loc[df['email'] == email, 'start_date'] = now
-        df.loc[df['email'] == email, 'expiry_date'] = expiry
-    else:
-        row = {"email": email, "start_date": now.isoformat(), "expiry_date": expiry.isoformat()}
-        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    save_subscribers(df)
+    now = int(time.time())
+    expiry = now + int(days_valid) * 86400
+    # new or renewal: append, load_subscribers keeps the latest row per email.
+    # Written synchronously (not queued): access checks must see it right away.
+    row = {"email": email, "start_date": now, "expiry_date": expiry}
+    _append_rows(SUBSCRIBERS_FILE, ["email","start_date","expiry_date"], [row])
+    _subscribers_index.clear()
+
+@st.cache_data(ttl=60)
+def _subscribers_index() -> dict:
+    # {email: expiry as epoch seconds}; dict() keeps the last row per email, like load_subscribers
+    if not os.path.exists(SUBSCRIBERS_FILE):
+        return {}
+    try:
+        df = pd.read_csv(SUBSCRIBERS_FILE, usecols=["email","expiry_date"])
+    except Exception:
+        return {}
+    expiry = _epoch_seconds(df['expiry_date'])
+    valid = expiry.notna()
+    return dict(zip(df['email'][valid], expiry[valid].astype("int64").tolist()))
 
 def check_access(email):
     if email is None or email == "":
         return False, None
-    df = load_subscribers()
-    row = df[df['email'] == email]
-    if row.empty:
+    ts = _subscribers_index().get(email)
+    if ts is None:
         return False, None
-    expiry = pd.to_datetime(row.iloc[0]['expiry_date'])
-    now = datetime.utcnow()
-    return expiry >= now, (expiry - now).days
+    delta = ts - time.time()
+    # floor, like timedelta.days: an expired subscription reports negative days
+    return delta >= 0, int(delta // 86400)
 
 def log_request(email, message=""):
-    df = _ensure_df(REQUESTS_LOG_FILE, ["email","message","timestamp"])
-    rec = {"email": email, "message": message, "timestamp": datetime.utcnow().isoformat()}
-    df = pd.concat([df, pd.DataFrame([rec])], ignore_index=True)
-    df.to_csv(REQUESTS_LOG_FILE, index=False)
+    rec = {"email": email, "message": message, "timestamp": int(time.time())}
+    _LOG_Q.put((REQUESTS_LOG_FILE, ["email","message","timestamp"], rec))
 
 # ---------------- Vinted scraping & analysis ----------------
-@st.cache_data(ttl=600)
-def search_vinted(query: str, max_pages: int = 2, pause: float = 1.0):
+# price cleanup: decimal comma -> dot, drop the euro sign, then keep only digits and dots
+_PRICE_TRANS = str.maketrans({",": ".", "\u20ac": None})
+_PRICE_RE = re.compile(r"[^\d.]")
+
+def parse_page(html):
     results = []
-    q = quote_plus(query)
-    for page in range(1, max_pages+1):
-        url = f"https://www.vinted.fr/catalog?search_text={q}&page={page}"
+    tree = LexborHTMLParser(html)
+    # keep the fallback order: one selector list per layout, never mixed
+    items = tree.css(".feed-grid__item") or tree.css(".catalog-item") or tree.css(".item")
+    for it in items:
+        title_tag = it.css_first(".feed-grid__item-title, h3, .title")
+        price_tag = it.css_first(".feed-grid__item-price, .price, span[data-testid='price']")
+        link_tag = it.css_first("a[href]")
+        if not (title_tag and price_tag and link_tag):
+            continue
+        title = title_tag.text().strip()
+        cleaned = _PRICE_RE.sub("", price_tag.text().translate(_PRICE_TRANS))
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=10)
-            if resp.status_code != 200:
-                continue
-        except Exception:
+            price = float(cleaned) if cleaned else None
+        except:
+            price = None
+        if price is None:
             continue
-        soup = BeautifulSoup(resp.text, "html.parser")
-        items = soup.select(".feed-grid__item") or soup.select(".catalog-item") or soup.select(".item") or []
-        for it in items:
-            title_tag = it.select_one(".feed-grid__item-title") or it.select_one("h3") or it.select_one(".title")
-            price_tag = it.select_one(".feed-grid__item-price") or it.select_one(".price") or it.select_one("span[data-testid='price']")
-            link_tag = it.find("a", href=True)
-            if not (title_tag and price_tag and link_tag):
-                continue
-            title = title_tag.get_text().strip()
-            price_text = price_tag.get_text().replace("€","").replace("\u20ac","").replace(",",".").strip()
-            cleaned = ''.join(ch for ch in price_text if (ch.isdigit() or ch == "."))
-            try:
-                price = float(cleaned) if cleaned else None
-            except:
-                price = None
-            if price is None:
-                continue
-            link = urljoin("https://www.vinted.fr", link_tag["href"])
-            results.append({"title": title, "price": price, "link": link})
-        time.sleep(pause)
+        link = urljoin("https://www.vinted.fr", link_tag.attributes.get("href"))
+        results.append({"title": title, "price": price, "link": link})
     return results
 
-def analyze_prices(items):
-    prices = [it["price"] for it in items if isinstance(it.get("price"), (int,float))]
-    if not prices:
+def _retry_delay(attempt, retry_after=None):
+    # Retry-After (seconds) wins when the server sends it; otherwise exponential backoff + jitter
+    if retry_after:
+        try:
+            return min(30, float(retry_after))
+        except ValueError:
+            pass
+    return min(30, 0.5 * 2**attempt) + random.random()*0.25
+
+async def _fetch_with_retry(session, url, sem, max_retries=4):
+    # returns the page HTML, or None once retries are exhausted / on a non-retryable status
+    for attempt in range(max_retries+1):
+        retry_after = None
+        try:
+            async with sem, session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                if resp.status == 200:
+                    # a badly encoded body still parses; don't lose the page over it
+                    return await resp.text(errors="replace")
+                if resp.status not in RETRY_STATUSES:
+                    return None
+                retry_after = resp.headers.get("Retry-After")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass  # transient: retry
+        except Exception:
+            return None  # anything else: this page is lost, the rest of the search goes on
+        if attempt < max_retries:
+            # sleep outside the semaphore so other pages keep flowing
+            await asyncio.sleep(_retry_delay(attempt, retry_after))
+    return None
+
+def _new_session():
+    # keep-alive connector: pages (and queries) on one session reuse TLS connections
+    connector = aiohttp.TCPConnector(limit_per_host=5, keepalive_timeout=30)
+    return aiohttp.ClientSession(connector=connector, headers=HEADERS)
+
+async def _search_one(session, query: str, max_pages: int, sem):
+    q = quote_plus(query)
+    urls = [f"https://www.vinted.fr/catalog?search_text={q}&page={page}" for page in range(1, max_pages+1)]
+    pages_html = await asyncio.gather(*[_fetch_with_retry(session, url, sem) for url in urls])
+    # parsing is CPU-bound: run it off the event loop
+    parsed = await asyncio.gather(*[asyncio.to_thread(parse_page, html) for html in pages_html if html])
+    return [item for page_items in parsed for item in page_items]
+
+async def _search_vinted_async(query: str, max_pages: int = 2):
+    # the semaphore + backoff replace the old sleep between pages (politeness)
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with _new_session() as session:
+        return await _search_one(session, query, max_pages, sem)
+
+async def search_vinted_batch(queries: list[str], max_pages: int = 2) -> dict:
+    # all queries share one session and one concurrency cap; returns {query: items}
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with _new_session() as session:
+        results = await asyncio.gather(*[_search_one(session, q, max_pages, sem) for q in queries],
+                                       return_exceptions=True)
+    # a failed query yields no items instead of aborting the whole scan
+    return {q: ([] if isinstance(r, BaseException) else r) for q, r in zip(queries, results)}
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fetch_vinted_pages(query: str, max_pages: int) -> list[dict]:
+    # cache key is (normalized query, pages) only, so UI tweaks don't trigger a re-scrape
+    return asyncio.run(_search_vinted_async(query, max_pages))
+
+def search_vinted(query: str, max_pages: int = 2):
+    # sync wrapper for the Streamlit page; no pause between pages
+    # (concurrency + backoff handle politeness)
+    return _fetch_vinted_pages(query.strip().lower(), max_pages)
+
+def analyze_prices_np(prices: np.ndarray) -> dict | None:
+    # NaN / non-finite prices (missing or unparsable values) are ignored
+    prices = np.asarray(prices, dtype=float)
+    prices = prices[np.isfinite(prices)]
+    if prices.size == 0:
         return None
-    avg = sum(prices)/len(prices)
-    return {"avg": avg, "min": min(prices), "max": max(prices), "count": len(prices)}
+    return {"avg": float(prices.mean()), "min": float(prices.min()), "max": float(prices.max()), "count": int(prices.size)}
+
+# Resale bins (ratio price/avg): <=0.6, <=1.0, <=1.4, above. One entry per bin.
+_BIN_EDGES = np.array([0.6, 1.0, 1.4])
+_LABELS = np.array(["🔥 Revente rapide", "✅ Bonne revente", "🕐 Vente lente", "🐢 Vente très lente"])
+_SCORES = np.array([90, 75, 50, 25])
+_LO = np.array([0.9, 0.95, 0.9, 0.8])
+_HI = np.array([1.1, 1.25, 1.3, 1.1])
+_TIME = np.array(["1-7 jours", "7-21 jours", "2-6 semaines", "1-3 mois"])
+
+def _resale_bins(ratio):
+    # right=True so a ratio exactly on an edge falls in the lower bin (<=)
+    return np.digitize(ratio, _BIN_EDGES, right=True)
 
 def resale_estimate_and_label(price, avg):
+    # scalar wrapper kept for single-value callers
     if avg <= 0:
         return ("Inconnu", 0, (0,0), "Inconnu")
-    ratio = price / avg
-    if ratio <= 0.6:
-        label = "🔥 Revente rapide"
-        time_days = "1-7 jours"
-        est_min = round(avg*0.9,2); est_max = round(avg*1.1,2)
-        score = 90
-    elif ratio <= 1.0:
-        label = "✅ Bonne revente"
-        time_days = "7-21 jours"
-        est_min = round(avg*0.95,2); est_max = round(avg*1.25,2)
-        score = 75
-    elif ratio <= 1.4:
-        label = "🕐 Vente lente"
-        time_days = "2-6 semaines"
-        est_min = round(avg*0.9,2); est_max = round(avg*1.3,2)
-        score = 50
-    else:
-        label = "🐢 Vente très lente"
-        time_days = "1-3 mois"
-        est_min = round(avg*0.8,2); est_max = round(avg*1.1,2)
-        score = 25
-    return (label, score, (est_min, est_max), time_days)
+    idx = int(_resale_bins(price / avg))
+    est = (round(float(avg*_LO[idx]), 2), round(float(avg*_HI[idx]), 2))
+    return (str(_LABELS[idx]), int(_SCORES[idx]), est, str(_TIME[idx]))
+
+def resale_vectorized(prices: np.ndarray, avg: float) -> dict:
+    # same bins as resale_estimate_and_label, for a whole price column in one pass
+    prices = np.asarray(prices, dtype=float)
+    if avg <= 0:
+        unknown = np.full(prices.shape, "Inconnu", dtype=object)
+        zeros = np.zeros(prices.shape)
+        return {"resale_label": unknown, "resale_score": zeros.astype(int), "resale_min": zeros,
+                "resale_max": zeros, "time_to_sell": unknown}
+    idx = _resale_bins(prices / avg)
+    return {"resale_label": _LABELS[idx], "resale_score": _SCORES[idx], "resale_min": np.round(avg*_LO[idx], 2),
+            "resale_max": np.round(avg*_HI[idx], 2), "time_to_sell": _TIME[idx]}
+
+def brand_mask(titles: pd.Series, brand: str) -> np.ndarray:
+    # case-insensitive substring test on each distinct (lowercased) title, broadcast to rows via the category codes
+    titles = titles.astype("category")
+    titles_lc = titles.cat.categories.str.lower()
+    brand_lc = brand.lower()
+    hits = np.fromiter((brand_lc in t for t in titles_lc), dtype=bool, count=len(titles_lc))
+    # trailing False: code -1 (missing title) never matches
+    return np.append(hits, False)[titles.cat.codes.to_numpy()]
 
 def market_saturation_label(count):
     if count < 10:
@@ -211,7 +384,10 @@ def average_color(image: Image.Image):
 
 def generate_description_from_photo_local(filename, pil_img):
     name = os.path.splitext(filename)[0].replace("_"," ").replace("-"," ").title()
-    r,g,b = average_color(pil_img)
+    # a mean colour doesn't need every pixel: work on a thumbnail (copy, the shown image stays full-size)
+    small = pil_img.copy()
+    small.thumbnail((128,128), Image.Resampling.BILINEAR)
+    r,g,b = average_color(small)
     if r>200 and g>200 and b>200:
         color = "clair / blanc"
     elif b>150 and r<120:
@@ -232,11 +408,14 @@ FAQ = {
     "debuter": "Commencez par t-shirts et casquettes, vendez x1.6-x2.",
     "prix": "Visez une marge 1.6–2.0 si possible."
 }
+# all FAQ keywords in one alternation: a single pass over the prompt, whatever the FAQ size
+_FAQ_RE = re.compile("|".join(re.escape(k) for k in FAQ), re.IGNORECASE)
+
 def chat_answer(prompt):
     p = prompt.lower()
-    for k,v in FAQ.items():
-        if k in p:
-            return v
+    m = _FAQ_RE.search(p)
+    if m:
+        return FAQ[m.group(0).lower()]
     if "quoi acheter" in p or "acheter" in p:
         return "Commence par petites pièces populaires (casquettes, t-shirts), faible cout d'entrée."
     return "Bonne question — préciser ex: 'quoi acheter pour 100€'"
@@ -250,7 +429,6 @@ st.sidebar.header("Filtres globaux")
 sel_brand = st.sidebar.selectbox("Filtre marque", BRAND_OPTIONS, index=0)
 price_min, price_max = st.sidebar.slider("Plage prix €", 0, 500, (0,200))
 pages = st.sidebar.slider("Pages à scrapper", 1, 5, 2)
-pause_between = st.sidebar.slider("Pause entre pages (s)", 0.5, 2.0, 1.0, step=0.5)
 
 # If app is private by default, show info and require admin for full access
 if PRIVATE_BY_DEFAULT and page != "Admin (privé)":
@@ -281,31 +459,29 @@ elif page == "Analyse Vinted":
                 st.error("Entrez une recherche.")
             else:
                 with st.spinner("Scraping..."):
-                    items = search_vinted(q, max_pages=pages, pause=pause_between)
+                    items = search_vinted(q, max_pages=pages)
                 if not items:
                     st.warning("Aucun résultat.")
                 else:
                     df = pd.DataFrame(items)
-                    # brand filter
+                    # compact dtypes: float32 prices, titles as category (repeated titles share one string)
+                    df = df.astype({"price": "float32", "title": "category"})
+                    # brand filter (plain substring, no regex engine)
                     if sel_brand != "All":
-                        df = df[df['title'].str.contains(sel_brand, case=False, na=False)]
+                        df = df[brand_mask(df['title'], sel_brand)]
                     # price filter
                     df = df[(df['price'] >= price_min) & (df['price'] <= price_max)]
                     log_search(q, sel_brand)
-                    analysis = analyze_prices(df.to_dict('records'))
+                    analysis = analyze_prices_np(df['price'].to_numpy())
                     if analysis:
                         st.metric("Prix moyen", f"{analysis['avg']:.2f} €")
                         st.write("Saturation :", market_saturation_label(analysis['count']))
                     # add resale info
                     if analysis:
-                        df['resale_label'] = df['price'].apply(lambda p: resale_estimate_and_label(p, analysis['avg'])[0])
-                        df['resale_score'] = df['price'].apply(lambda p: resale_estimate_and_label(p, analysis['avg'])[1])
-                        df['resale_min'] = df['price'].apply(lambda p: resale_estimate_and_label(p, analysis['avg'])[2][0])
-                        df['resale_max'] = df['price'].apply(lambda p: resale_estimate_and_label(p, analysis['avg'])[2][1])
-                        df['time_to_sell'] = df['price'].apply(lambda p: resale_estimate_and_label(p, analysis['avg'])[3])
+                        df = df.assign(**resale_vectorized(df['price'].to_numpy(), analysis['avg']))
                     st.dataframe(df.reset_index(drop=True))
-                    csv = df.to_csv(index=False).encode('utf-8')
-                    st.download_button("Télécharger résultats (.csv)", data=csv, file_name="vinted_results.csv")
+                    csv_bytes = df.to_csv(index=False).encode('utf-8')
+                    st.download_button("Télécharger résultats (.csv)", data=csv_bytes, file_name="vinted_results.csv")
                     st.success("Résultats prêts — clique sur une ligne pour ouvrir le lien.")
     with col2:
         st.markdown("Astuces")
@@ -345,10 +521,12 @@ elif page == "Statistiques":
             if 'price' not in d.columns:
                 st.error("CSV doit contenir colonne 'price'")
             else:
-                analysis = analyze_prices(d.to_dict('records'))
+                # uploaded CSV: non-numeric prices become NaN and are skipped
+                prices = pd.to_numeric(d['price'], errors='coerce').to_numpy()
+                analysis = analyze_prices_np(prices)
                 if analysis:
                     st.write(f"Prix moyen: {analysis['avg']:.2f} € — Count: {analysis['count']}")
-                    d['label'] = d['price'].apply(lambda p: resale_estimate_and_label(p, analysis['avg'])[0])
+                    d['label'] = resale_vectorized(prices, analysis['avg'])['resale_label']
                     st.dataframe(d)
         except Exception as e:
             st.error(f"Erreur: {e}")
@@ -381,20 +559,35 @@ elif page == "Admin (privé)":
 
     st.success("Code admin validé — accès admin accordé.")
     st.markdown("### Journaux & gestion local")
-    df_log = _ensure_df(DATA_LOG, ["timestamp","query","brand","user"])
+    df_log = _read_log(DATA_LOG, ["timestamp","query","brand","user"],
+                       dtypes={"query": "string", "brand": "category", "user": "category"}, epoch_cols=["timestamp"])
     if not df_log.empty:
-        st.dataframe(df_log.sort_values("timestamp", ascending=False).head(300))
+        st.dataframe(_with_datetimes(df_log.nlargest(300, "timestamp"), ["timestamp"]))
         if st.button("Télécharger journal"):
             st.download_button("Télécharger CSV", df_log.to_csv(index=False).encode('utf-8'), file_name="search_log.csv")
     else:
         st.info("Aucun log.")
 
+    st.markdown("#### Scan toutes marques")
+    if st.button("Lancer le scan (toutes marques)"):
+        with st.spinner("Scraping de toutes les marques..."):
+            batch = asyncio.run(search_vinted_batch(BRAND_OPTIONS[1:], pages))
+        rows = []
+        for brand, items in batch.items():
+            stats = analyze_prices_np(np.array([it["price"] for it in items], dtype=float))
+            rows.append({"brand": brand, "count": len(items),
+                         "avg": round(stats["avg"], 2) if stats else None,
+                         "min": stats["min"] if stats else None,
+                         "max": stats["max"] if stats else None,
+                         "saturation": market_saturation_label(len(items))})
+        st.dataframe(pd.DataFrame(rows))
+
     st.markdown("#### Abonnés (local)")
     df_sub = load_subscribers()
     if df_sub.empty:
         st.info("Pas d'abonnés.")
     else:
-        st.dataframe(df_sub)
+        st.dataframe(_with_datetimes(df_sub, ["start_date","expiry_date"]))
         if st.button("Télécharger abonnés"):
             st.download_button("Télécharger abonnés", df_sub.to_csv(index=False).encode('utf-8'), file_name="subscribers.csv")
 
@@ -409,9 +602,10 @@ elif page == "Admin (privé)":
             st.success(f"{new_email} ajouté pour {days} jours.")
 
     st.markdown("#### Demandes d'accès")
-    reqs = _ensure_df(REQUESTS_LOG_FILE, ["email","message","timestamp"])
+    reqs = _read_log(REQUESTS_LOG_FILE, ["email","message","timestamp"],
+                     dtypes={"email": "string", "message": "string"}, epoch_cols=["timestamp"])
     if not reqs.empty:
-        st.dataframe(reqs.sort_values("timestamp", ascending=False).head(200))
+        st.dataframe(_with_datetimes(reqs.nlargest(200, "timestamp"), ["timestamp"]))
         if st.button("Effacer demandes"):
             os.remove(REQUESTS_LOG_FILE)
             st.success("Demandes effacées.")
@@ -419,9 +613,11 @@ elif page == "Admin (privé)":
         st.info("Pas de demandes.")
 
     st.markdown("#### Favoris locaux")
-    favs = _ensure_df(DATA_FAVS, ["timestamp","title","price","link","user"])
+    favs = _read_log(DATA_FAVS, ["timestamp","title","price","link","user"],
+                     dtypes={"title": "string", "price": "float64", "link": "string", "user": "category"},
+                     epoch_cols=["timestamp"])
     if not favs.empty:
-        st.dataframe(favs)
+        st.dataframe(_with_datetimes(favs, ["timestamp"]))
         if st.button("Effacer favoris"):
             os.remove(DATA_FAVS)
             st.success("Favoris effacés.")